@@ -1,15 +1,52 @@
 """
 Audio input/output handling module.
 """
+import io
+import itertools
 import logging
-import os
-import tempfile
+import struct
+import threading
+import numpy as np
 import sounddevice as sd
 import soundfile as sf
-import pyaudio
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import miniaudio
+except ImportError:
+    miniaudio = None
+
+from .ring_buffer import RingBuffer
 
 logger = logging.getLogger(__name__)
 
+# sounddevice sample formats by (WAV format tag, bits per sample)
+_WAV_DTYPES = {
+    (1, 8): 'uint8',
+    (1, 16): 'int16',
+    (1, 24): 'int24',
+    (1, 32): 'int32',
+    (3, 32): 'float32',
+}
+
+class _ChunkSource(miniaudio.StreamableSource if miniaudio else object):
+    """Feeds encoded audio chunks to a miniaudio streaming decoder as they arrive."""
+    
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._pending = memoryview(b'')
+        
+    def read(self, num_bytes: int) -> bytes:
+        # Block on the next chunk only when the current one is used up
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return b''
+            self._pending = memoryview(chunk)
+        data = self._pending[:num_bytes]
+        self._pending = self._pending[num_bytes:]
+        return bytes(data)
+
 class AudioPlayer:
     def __init__(self, device_name: str = None):
         """
@@ -18,78 +55,97 @@ class AudioPlayer:
         Args:
             device_name (str): Name of the audio device to use (partial match)
         """
-        self._audio = pyaudio.PyAudio()
         self._device_name = device_name
-        #self._print_audio_info()
+        self._device_cache: Dict[Optional[str], dict] = {}
+        
+        # Output stream shared by all playback, opened on first use
+        self._out_stream: Optional[sd.OutputStream] = None
+        self._stream_format: Optional[Tuple[int, int]] = None
+        self._play_lock = threading.Lock()
+        
+        # State shared with the output stream callback
+        self._ring: Optional[RingBuffer] = None
+        self._space = threading.Event()
+        self._primed = threading.Event()
+        self._interrupted = threading.Event()
+        self._flushed = threading.Event()  # Set once the callback has dropped interrupted audio
+        if logger.isEnabledFor(logging.DEBUG):
+            self._print_audio_info()
         
     def _print_audio_info(self):
         """Print information about audio devices for debugging."""
         try:
-            logger.info("\nAudio Device Information:")
-            logger.info("-" * 50)
+            devices = sd.query_devices()
+            if len(devices) == 0:
+                logger.debug("No audio devices found")
+                return
+                
+            logger.debug("\nAudio Device Information:")
+            logger.debug("-" * 50)
             
             # Get default output device info
-            default_output = self._audio.get_default_output_device_info()
-            logger.info(f"Default Output Device:")
-            logger.info(f"  Name: {default_output['name']}")
-            logger.info(f"  Sample Rate: {int(default_output['defaultSampleRate'])} Hz")
-            logger.info(f"  Channels: {default_output['maxOutputChannels']}")
-            logger.info(f"  Device Index: {default_output['index']}")
+            default_output = sd.query_devices(kind='output')
+            logger.debug(f"Default Output Device:")
+            logger.debug(f"  Name: {default_output['name']}")
+            logger.debug(f"  Sample Rate: {int(default_output['default_samplerate'])} Hz")
+            logger.debug(f"  Channels: {default_output['max_output_channels']}")
+            logger.debug(f"  Device Index: {default_output['index']}")
             
             # List all available output devices
-            logger.info("\nAvailable Output Devices:")
-            for i in range(self._audio.get_device_count()):
-                try:
-                    info = self._audio.get_device_info_by_index(i)
-                    if info['maxOutputChannels'] > 0:  # Only show output devices
-                        logger.info(f"\nDevice {i}:")
-                        logger.info(f"  Name: {info['name']}")
-                        logger.info(f"  Sample Rate: {int(info['defaultSampleRate'])} Hz")
-                        logger.info(f"  Channels: {info['maxOutputChannels']}")
-                except Exception as e:
-                    logger.error(f"Error getting info for device {i}: {str(e)}")
-            logger.info("-" * 50)
+            logger.debug("\nAvailable Output Devices:")
+            for info in devices:
+                if info['max_output_channels'] > 0:  # Only show output devices
+                    logger.debug(f"\nDevice {info['index']}:")
+                    logger.debug(f"  Name: {info['name']}")
+                    logger.debug(f"  Sample Rate: {int(info['default_samplerate'])} Hz")
+                    logger.debug(f"  Channels: {info['max_output_channels']}")
+            logger.debug("-" * 50)
         except Exception as e:
             logger.error(f"Error getting audio information: {str(e)}")
 
     def _get_device_by_name(self, name: str = None) -> dict:
         """Get audio device info by name (partial match)."""
+        if name in self._device_cache:
+            return self._device_cache[name]
+            
         if not name:
-            return self._audio.get_default_output_device_info()
+            info = sd.query_devices(kind='output')
+            self._device_cache[name] = info
+            return info
             
         # Try to find a device matching the name
-        for i in range(self._audio.get_device_count()):
-            try:
-                info = self._audio.get_device_info_by_index(i)
-                if (info['maxOutputChannels'] > 0 and  # Only output devices
-                    name.lower() in info['name'].lower()):  # Case-insensitive partial match
-                    return info
-            except:
-                continue
+        for info in sd.query_devices():
+            if (info['max_output_channels'] > 0 and  # Only output devices
+                name.lower() in info['name'].lower()):  # Case-insensitive partial match
+                self._device_cache[name] = info
+                return info
                 
         # Fall back to default device
         logger.warning(f"Could not find audio device matching '{name}', using default")
-        return self._audio.get_default_output_device_info()
+        info = sd.query_devices(kind='output')
+        self._device_cache[name] = info
+        return info
 
-    def play_audio(self, audio_data: bytes = None, file_path: str = None, sample_rate: int = None):
+    def play_audio(self, audio_data: bytes = None, file_path: str = None, sample_rate: int = None) -> bool:
         """
         Play audio from either bytes data or a file.
         
         Args:
-            audio_data (bytes): Raw audio data to play
+            audio_data (bytes): Raw mono 16-bit PCM data to play
             file_path (str): Path to audio file to play
             sample_rate (int): Sample rate for raw audio data
+            
+        Returns:
+            bool: True if played to the end, False if interrupted
         """
         try:
             if audio_data and sample_rate:
                 # Play from memory
-                sd.play(audio_data, sample_rate)
-                sd.wait()
+                return self._play_pcm([np.frombuffer(audio_data, dtype=np.int16)], sample_rate, 1)
             elif file_path:
                 # Play from file
-                data, samplerate = sf.read(file_path)
-                sd.play(data, samplerate)
-                sd.wait()
+                data, samplerate = sf.read(file_path, dtype='int16', always_2d=True)
+                return self._play_pcm([data.reshape(-1)], samplerate, data.shape[1])
             else:
                 raise ValueError("Either audio_data with sample_rate or file_path must be provided")
                 
@@ -97,36 +153,230 @@ class AudioPlayer:
             logger.error(f"Error playing audio: {str(e)}")
             raise
 
-    def play_with_temp_file(self, audio_data: bytes, suffix: str = '.wav'):
+    def play_with_temp_file(self, audio_data: bytes, suffix: str = '.wav') -> bool:
         """
-        Play audio data by first saving to a temporary file.
-        Useful for formats that need to be written to disk first.
+        Play encoded audio data (e.g. WAV or MP3 bytes).
+        The data is decoded in memory to 16-bit PCM; no temporary file is written.
         
         Args:
             audio_data (bytes): The audio data to play
-            suffix (str): File extension for the temp file
+            suffix (str): Unused, kept for backward compatibility
+            
+        Returns:
+            bool: True if played to the end, False if interrupted
         """
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            temp_path = temp_file.name
-            try:
-                # Write data to temp file
-                temp_file.write(audio_data)
-                temp_file.flush()
-                
-                # Play the file
-                self.play_audio(file_path=temp_path)
+        try:
+            # TTS output is 16-bit, so decoding to int16 loses nothing and halves the data
+            data, samplerate = sf.read(io.BytesIO(audio_data), dtype='int16', always_2d=True)
+            return self._play_pcm([data.reshape(-1)], samplerate, data.shape[1])
+        except Exception as e:
+            logger.error(f"Error playing audio: {str(e)}")
+            raise
+
+    def play_stream(self, chunks: Iterable[bytes]) -> bool:
+        """
+        Play 16-bit WAV data while it is still arriving.
+        Playback starts as soon as the header has been received.
+        
+        Args:
+            chunks (Iterable[bytes]): WAV file data in arbitrarily sized chunks
+            
+        Returns:
+            bool: True if every chunk was played, False if interrupted before the end
+        """
+        chunks = iter(chunks)
+        buffer = bytearray()
+        try:
+            for chunk in chunks:
+                buffer += chunk
+                header = self._parse_wav_header(buffer)
+                if header is not None:
+                    break
+            else:
+                raise ValueError("Audio stream ended before a complete WAV header was received")
                 
+            sample_rate, channels, dtype, frame_size, data_offset = header
+            if dtype != 'int16':
+                raise ValueError(f"Unsupported WAV sample format {dtype}, expected 16-bit PCM")
+            del buffer[:data_offset]
+            
+            def frames() -> Iterator[np.ndarray]:
+                # Only pass on whole frames, keeping any partial frame for later
+                pending = buffer
+                for chunk in itertools.chain([b''], chunks):
+                    pending += chunk
+                    usable = len(pending) - len(pending) % frame_size
+                    if usable:
+                        yield np.frombuffer(bytes(pending[:usable]), dtype=np.int16)
+                        del pending[:usable]
+                        
+            return self._play_pcm(frames(), sample_rate, channels)
+        except Exception as e:
+            logger.error(f"Error playing audio stream: {str(e)}")
+            raise
+
+    def play_mp3_stream(self, chunks: Iterable[bytes], sample_rate: int = 24000, channels: int = 1,
+                        preroll_ms: int = 500) -> bool:
+        """
+        Play MP3 data while it is still arriving.
+        A single streaming decoder is used for the whole stream, so MP3 frames
+        split across chunk boundaries decode without gaps. Requires miniaudio.
+        
+        Args:
+            chunks (Iterable[bytes]): MP3 data in arbitrarily sized chunks
+            sample_rate (int): Output sample rate in Hz
+            channels (int): Number of output channels
+            preroll_ms (int): Audio to buffer before playback starts, hiding late chunks
+            
+        Returns:
+            bool: True if every chunk was played, False if interrupted before the end
+        """
+        if miniaudio is None:
+            raise RuntimeError("Streaming MP3 playback requires the miniaudio package")
+            
+        try:
+            decoder = miniaudio.stream_any(
+                _ChunkSource(chunks),
+                source_format=miniaudio.FileFormat.MP3,
+                output_format=miniaudio.SampleFormat.SIGNED16,
+                nchannels=channels,
+                sample_rate=sample_rate,
+            )
+            return self._play_pcm(
+                (np.frombuffer(samples, dtype=np.int16) for samples in decoder),
+                sample_rate, channels, preroll_ms,
+            )
+        except Exception as e:
+            logger.error(f"Error playing audio stream: {str(e)}")
+            raise
+
+    def _play_pcm(self, blocks: Iterable[np.ndarray], sample_rate: int, channels: int, preroll_ms: int = 0) -> bool:
+        """
+        Play interleaved int16 samples through the shared output stream.
+        
+        The stream stays open between calls; its callback drains a ring buffer,
+        so interrupt() can cut playback off at any point.
+        
+        Args:
+            blocks (Iterable[np.ndarray]): int16 samples, possibly still being produced
+            sample_rate (int): Sample rate in Hz
+            channels (int): Number of interleaved channels
+            preroll_ms (int): Audio to buffer before playback starts, hiding late blocks
+            
+        Returns:
+            bool: True if all blocks were played, False if interrupted
+        """
+        with self._play_lock:
+            ring = self._ensure_stream(sample_rate, channels)
+            if self._interrupted.is_set():
+                # Let the callback drop the interrupted audio before the ring is reused
+                self._flushed.wait(1.0)
+                self._interrupted.clear()
+            
+            # Hold back the first audio until there is enough to ride out network jitter
+            preroll = min(sample_rate * channels * preroll_ms // 1000, ring.capacity)
+            try:
+                for pcm in blocks:
+                    while len(pcm):
+                        if self._interrupted.is_set():
+                            return False
+                        self._space.clear()
+                        pcm = pcm[ring.write(pcm):]
+                        if ring.available >= preroll:
+                            self._primed.set()
+                        if len(pcm):
+                            self._space.wait(0.1)
+                            
+                # Short utterances may not have filled the pre-roll
+                self._primed.set()
+                while ring.available and not self._interrupted.is_set():
+                    self._space.clear()
+                    self._space.wait(0.1)
+                return not self._interrupted.is_set()
             finally:
-                # Clean up
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass
+                self._primed.clear()
+
+    def _ensure_stream(self, sample_rate: int, channels: int) -> RingBuffer:
+        """Open the output stream once, reopening it only when the audio format changes."""
+        if self._out_stream is not None and self._stream_format == (sample_rate, channels):
+            return self._ring
+        self._close_stream()
+        
+        # Room for about two seconds of audio
+        self._ring = RingBuffer(2 * sample_rate * channels)
+        self._out_stream = sd.OutputStream(
+            device=self._get_device_by_name(self._device_name)['index'],
+            samplerate=sample_rate, channels=channels, dtype='int16',
+            blocksize=512, callback=self._pa_callback,
+        )
+        self._out_stream.start()
+        self._stream_format = (sample_rate, channels)
+        return self._ring
+
+    def _close_stream(self):
+        """Close the shared output stream, if open."""
+        if self._out_stream is not None:
+            stream, self._out_stream = self._out_stream, None
+            stream.stop()
+            stream.close()
+
+    def _pa_callback(self, outdata: np.ndarray, frames: int, time, status) -> None:
+        """Output stream callback, feeding the device from the ring buffer."""
+        if self._interrupted.is_set():
+            self._ring.clear()
+            self._flushed.set()
+        if self._primed.is_set():
+            self._ring.read_into(outdata.reshape(-1))
+        else:
+            outdata.fill(0)
+        self._space.set()
+
+    def interrupt(self):
+        """Stop the current playback immediately, dropping any buffered audio."""
+        self._flushed.clear()
+        self._interrupted.set()
+        self._space.set()
+
+    @staticmethod
+    def _parse_wav_header(data: bytearray) -> Optional[Tuple[int, int, str, int, int]]:
+        """
+        Parse a WAV header from the start of a partially received file.
+        
+        Returns:
+            Optional[Tuple[int, int, str, int, int]]: Sample rate, channels, sample format,
+            frame size and the offset of the sample data, or None if more data is needed
+        """
+        if len(data) < 12:
+            return None
+        if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+            raise ValueError("Audio stream is not a WAV file")
+            
+        fmt = None
+        pos = 12
+        while pos + 8 <= len(data):
+            chunk_id = bytes(data[pos:pos + 4])
+            size = struct.unpack_from('<I', data, pos + 4)[0]
+            if chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError("WAV data chunk precedes its fmt chunk")
+                return fmt + (pos + 8,)
+            if pos + 8 + size > len(data):
+                return None
+            if chunk_id == b'fmt ':
+                format_tag, channels, sample_rate = struct.unpack_from('<HHI', data, pos + 8)
+                bits = struct.unpack_from('<H', data, pos + 22)[0]
+                dtype = _WAV_DTYPES.get((format_tag, bits))
+                if dtype is None:
+                    raise ValueError(f"Unsupported WAV format {format_tag} with {bits} bits per sample")
+                fmt = (sample_rate, channels, dtype, channels * bits // 8)
+            # Chunks are padded to an even size
+            pos += 8 + size + (size & 1)
+        return None
 
     def __del__(self):
         """Cleanup when the object is destroyed."""
         try:
-            if hasattr(self, '_audio'):
-                self._audio.terminate()
+            if hasattr(self, '_out_stream'):
+                self._close_stream()
         except:
             pass 
\ No newline at end of file
@@ -1,9 +1,54 @@
 """Audio filter module for applying effects to TTS output."""
 
+import math
 import numpy as np
 from scipy import signal
 from typing import Optional, Tuple
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _robot_kernel(audio: np.ndarray, sample_rate: int, intensity: float, final_gain: float) -> np.ndarray:
+    """Fused robot modulation and peak normalization over a float32 buffer."""
+    n = audio.shape[0]
+    out = np.empty_like(audio)
+    w = 2.0 * math.pi * 10.0 / sample_rate
+    # sin(w * i) via the recurrence s[i + 1] = 2 cos(w) s[i] - s[i - 1]
+    k = 2.0 * math.cos(w)
+    s0 = 0.0
+    s1 = math.sin(w)
+    amax = 0.0
+    for i in range(n):
+        v = audio[i] * (1.0 + intensity * s0)
+        out[i] = v
+        s2 = k * s1 - s0
+        s0 = s1
+        s1 = s2
+        a = abs(v)
+        if a > amax:
+            amax = a
+    # Silence has nothing to normalize
+    if amax == 0.0:
+        return out
+    scale = final_gain / amax
+    for i in range(n):
+        out[i] *= scale
+    return out
+
+
+if njit is not None:
+    _robot_kernel = njit(cache=True, fastmath=True)(_robot_kernel)
+
+
+def _peak(audio: np.ndarray) -> float:
+    """Absolute peak of a buffer without allocating an abs() temporary."""
+    if audio.size == 0:
+        return 0.0
+    return max(audio.max(), -audio.min())
+
 class AudioFilter:
     """Applies various audio filters to make speech sound more AI-like."""
     
@@ -14,6 +59,7 @@ class AudioFilter:
             sample_rate: The sample rate of the audio in Hz
         """
         self.sample_rate = sample_rate
+        self._scratch = np.empty(0, dtype=np.float32)
         
     def apply_filter(
         self,
@@ -21,7 +67,8 @@ class AudioFilter:
         filter_type: str,
         intensity: float = 0.5,
         echo_delay: float = 0.1,
-        echo_decay: float = 0.5
+        echo_decay: float = 0.5,
+        final_gain: float = 1.0
     ) -> np.ndarray:
         """Apply the specified filter to the audio.
         
@@ -31,50 +78,62 @@ class AudioFilter:
             intensity: Filter intensity (0.0 to 1.0)
             echo_delay: Echo delay in seconds (for echo filter)
             echo_decay: Echo decay factor (0.0 to 1.0)
+            final_gain: Gain applied together with the final normalization
             
         Returns:
-            Filtered audio array
+            Filtered audio array. The echo filter writes into an internal
+            scratch buffer, so its result is only valid until the next call.
         """
         if filter_type == "none":
-            return audio
+            return audio * final_gain if final_gain != 1.0 else audio
             
         # Ensure audio is float32
-        audio = audio.astype(np.float32)
+        audio = audio.astype(np.float32, copy=False)
         
         if filter_type == "robot":
-            return self._apply_robot_filter(audio, intensity)
+            return self._apply_robot_filter(audio, intensity, final_gain)
         elif filter_type == "echo":
-            return self._apply_echo_filter(audio, echo_delay, echo_decay)
+            return self._apply_echo_filter(audio, echo_delay, echo_decay, final_gain)
         else:
             raise ValueError(f"Unknown filter type: {filter_type}")
             
-    def _apply_robot_filter(self, audio: np.ndarray, intensity: float) -> np.ndarray:
+    def _apply_robot_filter(self, audio: np.ndarray, intensity: float, final_gain: float = 1.0) -> np.ndarray:
         """Apply a robot-like filter using frequency modulation.
         
         Args:
             audio: Input audio array
             intensity: Filter intensity (0.0 to 1.0)
+            final_gain: Gain applied together with the final normalization
             
         Returns:
             Filtered audio array
         """
-        # Create a modulating signal
-        t = np.arange(len(audio)) / self.sample_rate
-        modulator = np.sin(2 * np.pi * 10 * t) * intensity
+        if njit is not None:
+            return _robot_kernel(np.ascontiguousarray(audio), self.sample_rate, intensity, final_gain)
+        
+        # Create a modulating signal, reusing one buffer for every step
+        modulator = np.arange(len(audio), dtype=np.float32)
+        modulator *= 2 * np.pi * 10 / self.sample_rate
+        np.sin(modulator, out=modulator)
+        modulator *= intensity
+        modulator += 1.0
         
         # Apply frequency modulation
-        filtered = audio * (1 + modulator)
+        np.multiply(audio, modulator, out=modulator)
         
-        # Normalize to prevent clipping
-        filtered = filtered / np.max(np.abs(filtered))
+        # Normalize to prevent clipping, leaving silence unscaled
+        peak = _peak(modulator)
+        if peak > 0:
+            modulator *= final_gain / peak
         
-        return filtered
+        return modulator
         
     def _apply_echo_filter(
         self,
         audio: np.ndarray,
         delay: float,
-        decay: float
+        decay: float,
+        final_gain: float = 1.0
     ) -> np.ndarray:
         """Apply an echo effect to the audio.
         
@@ -82,6 +141,7 @@ class AudioFilter:
             audio: Input audio array
             delay: Echo delay in seconds
             decay: Echo decay factor (0.0 to 1.0)
+            final_gain: Gain applied together with the final normalization
             
         Returns:
             Filtered audio array
@@ -89,14 +149,21 @@ class AudioFilter:
         # Calculate delay in samples
         delay_samples = int(delay * self.sample_rate)
         
-        # Create echo buffer
-        echo = np.zeros_like(audio)
-        echo[delay_samples:] = audio[:-delay_samples] * decay
+        # Reuse the scratch buffer, growing it only when needed
+        n = audio.size
+        if self._scratch.size < n:
+            self._scratch = np.empty(n, dtype=np.float32)
+        filtered = self._scratch[:n]
         
-        # Combine original and echo
-        filtered = audio + echo
+        # Combine original and echo: y[i] = x[i] + decay * x[i - delay_samples]
+        delay_samples = min(delay_samples, n)
+        filtered[:delay_samples] = audio[:delay_samples]
+        np.multiply(audio[:n - delay_samples], decay, out=filtered[delay_samples:])
+        np.add(filtered[delay_samples:], audio[delay_samples:], out=filtered[delay_samples:])
         
-        # Normalize to prevent clipping
-        filtered = filtered / np.max(np.abs(filtered))
+        # Normalize to prevent clipping, leaving silence unscaled
+        peak = _peak(filtered)
+        if peak > 0:
+            np.multiply(filtered, final_gain / peak, out=filtered)
         
-        return filtered 
\ No newline at end of file
+        return filtered
\ No newline at end of file
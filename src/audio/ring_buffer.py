@@ -0,0 +1,73 @@
+"""
+Single-producer, single-consumer sample ring buffer for callback playback.
+"""
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-size ring of int16 samples.
+
+    One thread writes and one thread (the audio callback) reads. Each side only
+    advances its own index, so no lock is needed.
+    """
+
+    def __init__(self, min_capacity: int):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            min_capacity (int): Minimum number of samples to hold, rounded up to a power of two
+        """
+        self.capacity = 1 << max(min_capacity - 1, 1).bit_length()
+        self._mask = self.capacity - 1
+        self._buf = np.zeros(self.capacity, dtype=np.int16)
+        self._read = 0
+        self._write = 0
+
+    @property
+    def available(self) -> int:
+        """Number of samples waiting to be read."""
+        return self._write - self._read
+
+    def write(self, samples: np.ndarray) -> int:
+        """
+        Copy as many samples as fit into the buffer.
+
+        Args:
+            samples (np.ndarray): int16 samples to append
+
+        Returns:
+            int: Number of samples written
+        """
+        n = min(len(samples), self.capacity - self.available)
+        if n:
+            start = self._write & self._mask
+            first = min(n, self.capacity - start)
+            self._buf[start:start + first] = samples[:first]
+            self._buf[:n - first] = samples[first:n]
+            self._write += n
+        return n
+
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        Fill out with buffered samples, padding with silence on a short read.
+
+        Args:
+            out (np.ndarray): int16 array to fill
+
+        Returns:
+            int: Number of buffered samples copied
+        """
+        n = min(len(out), self.available)
+        start = self._read & self._mask
+        first = min(n, self.capacity - start)
+        out[:first] = self._buf[start:start + first]
+        out[first:n] = self._buf[:n - first]
+        out[n:] = 0
+        self._read += n
+        return n
+
+    def clear(self) -> None:
+        """Drop all buffered samples. Must be called from the reading side."""
+        self._read = self._write
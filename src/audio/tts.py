@@ -1,8 +1,10 @@
 """Text-to-speech module for handling speech synthesis."""
 
 import asyncio
+import collections
+import io
+import threading
 import edge_tts
-import numpy as np
 import sounddevice as sd
 import soundfile as sf
 from typing import Optional
@@ -11,6 +13,8 @@ from ..config import Config
 
 class TTS:
     """Text-to-speech handler using Edge TTS."""
+    
+    BLOCK_SIZE = 1024  # Frames per output stream callback
 
     def __init__(self, config: Config):
         """Initialize TTS with configuration.
@@ -20,7 +24,13 @@ class TTS:
         """
         self.config = config
         self.tts_config = config.tts_config
-        self.audio_filter = AudioFilter(sample_rate=22050)  # Edge TTS sample rate
+        self.audio_filter = AudioFilter(sample_rate=24000)  # Rebound to the decoded rate in speak()
+        
+        # Pending output blocks, drained by the audio callback. Each utterance
+        # is terminated by a threading.Event that is set once it has played.
+        self._blocks = collections.deque()
+        self._stream = None
+        self._stream_rate = None
         
     async def speak(self, text: str) -> None:
         """Convert text to speech and play it.
@@ -33,26 +43,79 @@ class TTS:
         
         # Generate speech using Edge TTS
         communicate = edge_tts.Communicate(text, voice)
-        audio_data = await communicate.get_audio()
+        audio_data = bytearray()
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                audio_data += chunk["data"]
         
-        # Convert to numpy array
-        audio = np.frombuffer(audio_data, dtype=np.float32)
+        # Decode the MP3 stream to float32 samples
+        audio, sample_rate = sf.read(io.BytesIO(audio_data), dtype="float32", always_2d=False)
         
-        # Apply filter if enabled
+        # Apply filter if enabled, folding the volume into its normalization
+        volume = self.tts_config.get("volume", 1.0)
         if self.tts_config.get("filter", {}).get("enabled", False):
+            if self.audio_filter.sample_rate != sample_rate:
+                self.audio_filter = AudioFilter(sample_rate=sample_rate)
             filter_config = self.tts_config["filter"]
             audio = self.audio_filter.apply_filter(
                 audio,
                 filter_type=filter_config.get("type", "robot"),
                 intensity=filter_config.get("intensity", 0.5),
                 echo_delay=filter_config.get("echo_delay", 0.1),
-                echo_decay=filter_config.get("echo_decay", 0.5)
+                echo_decay=filter_config.get("echo_decay", 0.5),
+                final_gain=volume
             )
+        elif volume != 1.0:
+            audio *= volume
         
-        # Apply volume adjustment
-        volume = self.tts_config.get("volume", 1.0)
-        audio = audio * volume
+        # Queue the audio on the output stream and wait until it has played
+        self._ensure_stream(sample_rate)
+        done = threading.Event()
+        for start in range(0, len(audio), self.BLOCK_SIZE):
+            self._blocks.append(audio[start:start + self.BLOCK_SIZE])
+        self._blocks.append(done)
+        await asyncio.get_running_loop().run_in_executor(None, done.wait)
+    
+    def _ensure_stream(self, sample_rate: int) -> None:
+        """Open the persistent output stream, reopening it if the rate changed.
         
-        # Play the audio
-        sd.play(audio, samplerate=22050)
-        sd.wait()  # Wait until audio is finished playing 
\ No newline at end of file
+        Args:
+            sample_rate: Sample rate of the audio to be played
+        """
+        if self._stream is not None and self._stream_rate == sample_rate:
+            return
+        if self._stream is not None:
+            self._stream.close()
+        self._stream = sd.OutputStream(
+            samplerate=sample_rate,
+            channels=1,
+            dtype="float32",
+            blocksize=self.BLOCK_SIZE,
+            latency="low",
+            callback=self._audio_cb
+        )
+        self._stream.start()
+        self._stream_rate = sample_rate
+    
+    def _audio_cb(self, outdata, frames, time, status) -> None:
+        """Copy the next pending block into the output buffer."""
+        try:
+            block = self._blocks.popleft()
+        except IndexError:
+            outdata.fill(0)
+            return
+        if isinstance(block, threading.Event):
+            outdata.fill(0)
+            block.set()
+            return
+        n = len(block)
+        outdata[:n, 0] = block
+        outdata[n:] = 0
+    
+    def __del__(self):
+        """Cleanup when the object is destroyed."""
+        try:
+            if self._stream is not None:
+                self._stream.close()
+        except:
+            pass
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+Cached YAML configuration loading.
+"""
+import copy
+import functools
+import os
+from typing import Any, Dict
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+@functools.lru_cache(maxsize=None)
+def _load_yaml(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a YAML file, cached on its path and modification time."""
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=SafeLoader) or {}
+
+
+def load_yaml(path: str) -> Dict[str, Any]:
+    """
+    Load a YAML configuration file, reusing the parsed result while the file is unchanged.
+    
+    Args:
+        path (str): Path to the YAML file
+        
+    Returns:
+        Dict[str, Any]: A private copy of the parsed configuration
+        
+    Raises:
+        FileNotFoundError: If the file does not exist
+        yaml.YAMLError: If the file cannot be parsed
+    """
+    mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+    return copy.deepcopy(_load_yaml(path, mtime))
\ No newline at end of file
@@ -1,11 +1,21 @@
 """
 DeepSeek LLM integration using Ollama.
 """
-import os
+import asyncio
+import re
+import textwrap
+import threading
 import yaml
 import requests
-import json
-from typing import Optional, Dict, Any, Generator, Callable, Union
+import orjson
+from typing import Optional, Dict, Any, AsyncGenerator, Generator, Callable, List, Union
+from ..config_utils import load_yaml
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+_WS_RE = re.compile(r"\s+")
+_ARTIFACTS_RE = re.compile(r"speak now|Human:|Assistant:")
+_THINK_RE = re.compile(r"^.*</think>", re.DOTALL)
 
 
 class DeepSeekLLM:
@@ -20,13 +30,32 @@ class DeepSeekLLM:
         self.api_url = self.config.get("api_url", "http://localhost:11434")
         self.model_name = self.config.get("model_name", "deepseek-coder:latest")
         self.system_prompt = self.config.get("system_prompt")
-        self._ensure_model_available()
+        
+        # Line wrapper for responses, built once when wrapping is configured
+        max_line_length = self.config.get("formatting", {}).get("max_line_length")
+        self._wrapper = textwrap.TextWrapper(
+            width=max_line_length,
+            break_long_words=False,
+            break_on_hyphens=False,
+            replace_whitespace=False
+        ) if max_line_length else None
+        
+        # Reuse pooled keep-alive connections across requests
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
+        # Check the model in the background so startup isn't blocked on Ollama
+        self._model_ready = False
+        self._model_error: Optional[Exception] = None
+        self._model_check = threading.Thread(target=self._check_model, daemon=True)
+        self._model_check.start()
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         try:
-            with open(config_path, "r") as f:
-                return yaml.safe_load(f)
+            return load_yaml(config_path)
         except FileNotFoundError:
             print(f"Warning: Config file {config_path} not found. Using defaults.")
             return {}
@@ -39,7 +68,7 @@ class DeepSeekLLM:
         try:
             # First check if Ollama is running
             try:
-                response = requests.get(f"{self.api_url}/api/tags")
+                response = self._session.get(f"{self.api_url}/api/tags")
                 response.raise_for_status()
             except requests.exceptions.ConnectionError:
                 raise Exception(
@@ -52,15 +81,16 @@ class DeepSeekLLM:
                 raise Exception(f"Error connecting to Ollama: {str(e)}")
 
             # Check if model exists
-            models = response.json().get("models", [])
+            models = orjson.loads(response.content).get("models", [])
             model_exists = any(model.get("name") == self.model_name for model in models)
 
             if not model_exists:
                 print(f"Model {self.model_name} not found. Pulling...")
                 try:
-                    response = requests.post(
+                    response = self._session.post(
                         f"{self.api_url}/api/pull",
-                        json={"name": self.model_name}
+                        data=orjson.dumps({"name": self.model_name}),
+                        headers=_JSON_HEADERS
                     )
                     response.raise_for_status()
                     print(f"Successfully pulled model {self.model_name}")
@@ -70,78 +100,124 @@ class DeepSeekLLM:
         except Exception as e:
             raise Exception(f"Failed to ensure model availability: {str(e)}")
 
-    def _clean_response(self, response: str) -> str:
-        """Clean and format the response text."""
+    def _check_model(self) -> None:
+        """Run the model availability check, recording any failure."""
+        try:
+            self._ensure_model_available()
+        except Exception as e:
+            self._model_error = e
+
+    def _wait_for_model(self) -> None:
+        """
+        Block until the model is known to be available.
+        The first call waits for the background check; after a failure, later calls re-run the check.
+        """
+        if self._model_ready:
+            return
+        if self._model_check is not None:
+            self._model_check.join()
+            self._model_check = None
+            error, self._model_error = self._model_error, None
+            if error is not None:
+                raise error
+        else:
+            # Ollama may have come up or finished pulling since the last failed check
+            self._ensure_model_available()
+        self._model_ready = True
+
+    def clean_text(self, text: str, ensure_ending: bool = True) -> str:
+        """
+        Apply the configured artifact removal, whitespace cleanup and sentence ending to text.
+        Used on whole responses and on streamed sentences before they are spoken.
+        
+        Args:
+            text (str): The response text, or a part of it
+            ensure_ending (bool): Whether to apply the ensure_sentence_endings step
+            
+        Returns:
+            str: The cleaned text
+        """
         formatting_config = self.config.get("formatting", {})
         
         # Remove artifacts if configured
         if formatting_config.get("remove_artifacts", True):
-            response = response.replace("speak now", "")
-            response = response.replace("Human:", "").replace("Assistant:", "")
+            text = _ARTIFACTS_RE.sub("", text)
             # Remove <think> sections
-            if "<think>" in response:
-                response = response.split("</think>")[-1].strip()
+            if "<think>" in text:
+                text = _THINK_RE.sub("", text, count=1).strip()
         
         # Clean whitespace if configured
         if formatting_config.get("clean_whitespace", True):
-            response = response.strip()
-            # Replace multiple spaces with single space
-            response = " ".join(response.split())
+            # Replace runs of whitespace with a single space
+            text = _WS_RE.sub(" ", text).strip()
         
         # Ensure sentence endings if configured
-        if formatting_config.get("ensure_sentence_endings", True):
-            if not response.endswith((".", "!", "?")):
-                response += "."
+        if ensure_ending and formatting_config.get("ensure_sentence_endings", True):
+            if not text.endswith((".", "!", "?")):
+                text += "."
+        
+        return text
+
+    def _clean_response(self, response: str) -> str:
+        """Clean and format the response text."""
+        response = self.clean_text(response)
         
         # Format line length if configured
-        if formatting_config.get("max_line_length"):
-            max_length = formatting_config["max_line_length"]
-            lines = response.split("\n")
-            formatted_lines = []
-            for line in lines:
-                if len(line) > max_length:
-                    # Split long lines at word boundaries
-                    words = line.split()
-                    current_line = []
-                    current_length = 0
-                    for word in words:
-                        if current_length + len(word) + 1 <= max_length:
-                            current_line.append(word)
-                            current_length += len(word) + 1
-                        else:
-                            formatted_lines.append(" ".join(current_line))
-                            current_line = [word]
-                            current_length = len(word)
-                    if current_line:
-                        formatted_lines.append(" ".join(current_line))
-                else:
-                    formatted_lines.append(line)
-            response = "\n".join(formatted_lines)
+        if self._wrapper:
+            max_length = self._wrapper.width
+            # Split long lines at word boundaries
+            lines = [
+                self._wrapper.fill(line) if len(line) > max_length else line
+                for line in response.split("\n")
+            ]
+            response = "\n".join(lines)
         
         return response
 
+    @staticmethod
+    def _iter_json_lines(response: requests.Response) -> Generator[Dict[str, Any], None, None]:
+        """Parse newline-delimited JSON objects from a streamed response."""
+        pending = bytearray()
+        for data in response.iter_content(chunk_size=None):
+            pending += data
+            start = 0
+            while True:
+                end = pending.find(b"\n", start)
+                if end < 0:
+                    break
+                line = pending[start:end]
+                start = end + 1
+                if line.strip():
+                    try:
+                        yield orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        continue
+            del pending[:start]
+        
+        # Handle a trailing object without a final newline
+        if pending.strip():
+            try:
+                yield orjson.loads(pending)
+            except orjson.JSONDecodeError:
+                pass
+
     def _stream_response(
         self,
         response: requests.Response,
         callback: Optional[Callable[[str], None]] = None
     ) -> Generator[str, None, None]:
         """Stream the response from the model."""
-        buffer = ""
-        for line in response.iter_lines():
-            if line:
-                try:
-                    chunk = json.loads(line)
-                    if "response" in chunk:
-                        buffer += chunk["response"]
-                        if callback:
-                            callback(chunk["response"])
-                        yield chunk["response"]
-                except json.JSONDecodeError:
-                    continue
+        parts: List[str] = []
+        for chunk in self._iter_json_lines(response):
+            if "response" in chunk:
+                parts.append(chunk["response"])
+                if callback:
+                    callback(chunk["response"])
+                yield chunk["response"]
         
         # Clean and format the complete response
-        if buffer:
-            yield self._clean_response(buffer)
+        if parts:
+            yield self._clean_response("".join(parts))
 
     def generate_response(
         self,
@@ -162,6 +238,74 @@ class DeepSeekLLM:
         Returns:
             Union[str, Generator[str, None, None]]: The model's response or a generator for streaming
         """
+        response = self._post_generate(prompt, system_prompt, stream)
+        if stream:
+            return self._stream_response(response, callback)
+        else:
+            return self._clean_response(orjson.loads(response.content)["response"])
+
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Asynchronously stream response tokens from the model.
+        
+        A leading <think> section is dropped, so every yielded token belongs
+        to the answer itself. Blocking network reads run in the default executor.
+        
+        Args:
+            prompt (str): The user's prompt
+            system_prompt (Optional[str]): Optional system prompt to guide the model
+            
+        Yields:
+            str: Response tokens as they arrive
+        """
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, self._post_generate, prompt, system_prompt, True)
+        chunks = self._iter_json_lines(response)
+        done = object()
+        
+        # Hold back leading tokens until we know whether they are reasoning
+        held = ""
+        visible = False
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, next, chunks, done)
+                if chunk is done:
+                    break
+                token = chunk.get("response")
+                if not token:
+                    continue
+                
+                if not visible:
+                    held += token
+                    stripped = held.lstrip()
+                    if "<think>".startswith(stripped):
+                        continue
+                    if stripped.startswith("<think>"):
+                        end = held.find("</think>")
+                        if end < 0:
+                            continue
+                        token = held[end + len("</think>"):].lstrip()
+                    else:
+                        token = held
+                    visible = True
+                    held = ""
+                    if not token:
+                        continue
+                yield token
+            
+            if held and "<think>" not in held:
+                yield held
+        finally:
+            response.close()
+
+    def _post_generate(self, prompt: str, system_prompt: Optional[str], stream: bool) -> requests.Response:
+        """Send a generation request to Ollama and return the raw response."""
+        self._wait_for_model()
+        
         try:
             # Use provided system prompt or default from config
             system_prompt = system_prompt or self.system_prompt
@@ -178,17 +322,14 @@ class DeepSeekLLM:
             if "generation" in self.config:
                 params.update(self.config["generation"])
             
-            response = requests.post(
+            response = self._session.post(
                 f"{self.api_url}/api/generate",
-                json=params,
+                data=orjson.dumps(params),
+                headers=_JSON_HEADERS,
                 stream=stream
             )
             response.raise_for_status()
-            
-            if stream:
-                return self._stream_response(response, callback)
-            else:
-                return self._clean_response(response.json()["response"])
+            return response
             
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to generate response: {str(e)}")
@@ -1,10 +1,11 @@
 """
 Main entry point for the TalkToLLM application.
 """
+import asyncio
 import logging
 import os
 import sys
-import re
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the project root directory to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -13,13 +14,7 @@ sys.path.insert(0, project_root)
 from src.transcription.realtime_stt import RealtimeTranscriber
 from src.llm.deepseek import DeepSeekLLM
 from src.tts import create_tts
-
-def split_into_sentences(text: str) -> list[str]:
-    """Split text into sentences, handling multiple punctuation marks."""
-    # Split on period, exclamation mark, or question mark followed by space or end of string
-    sentences = re.split(r'(?<=[.!?])(?:\s+|\Z)', text)
-    # Filter out empty strings and strip whitespace
-    return [s.strip() for s in sentences if s.strip()]
+from src.text_utils import pop_speakable_sentences
 
 def main():
     """Main function to run the voice interaction loop."""
@@ -34,23 +29,60 @@ def main():
         llm = DeepSeekLLM()
         tts = create_tts()  # Will use Coqui by default
         
+        # Bounded so the local TTS server isn't flooded with requests
+        synth_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts-synth")
+        
+        async def respond(text: str) -> None:
+            """Stream the LLM response and speak each sentence as it completes.
+            
+            Sentences are synthesized in parallel on the worker pool as soon as
+            they are complete, and played back in order.
+            """
+            loop = asyncio.get_running_loop()
+            tts_queue: asyncio.Queue = asyncio.Queue()
+            
+            async def speak(sentence: str, final: bool = False) -> None:
+                # Apply the LLM's response formatting before the sentence is read aloud
+                sentence = llm.clean_text(sentence, ensure_ending=False)
+                if not sentence:
+                    return
+                if final:
+                    sentence = llm.clean_text(sentence)
+                await tts_queue.put(loop.run_in_executor(synth_pool, tts.synthesize, sentence))
+            
+            async def produce() -> None:
+                parts = []
+                buffer = ""
+                try:
+                    async for token in llm.agenerate_stream(text):
+                        parts.append(token)
+                        buffer += token
+                        sentences, buffer = pop_speakable_sentences(buffer)
+                        for sentence in sentences:
+                            await speak(sentence)
+                    await speak(buffer, final=True)
+                    logger.info(f"LLM response: {''.join(parts).strip()}")
+                finally:
+                    await tts_queue.put(None)
+            
+            async def consume() -> None:
+                while True:
+                    audio = await tts_queue.get()
+                    if audio is None:
+                        break
+                    try:
+                        # TTS playback blocks, so keep it off the event loop
+                        await asyncio.to_thread(tts.play, await audio)
+                    except Exception as e:
+                        logger.error(f"Error speaking sentence: {e}")
+            
+            await asyncio.gather(produce(), consume())
+        
         def process_voice_input(text: str) -> None:
             """Process transcribed text through LLM and TTS."""
             try:
-                # Generate LLM response
                 logger.info(f"User said: {text}")
-                response = llm.generate_response(text)
-                logger.info(f"LLM response: {response}")
-                
-                # Split response into sentences and speak each one
-                sentences = split_into_sentences(response)
-                for sentence in sentences:
-                    if sentence:  # Skip empty sentences
-                        try:
-                            tts.speak(sentence)
-                        except Exception as e:
-                            logger.error(f"Error speaking sentence: {e}")
-                            continue
+                asyncio.run(respond(text))
             except Exception as e:
                 logger.error(f"Error processing voice input: {e}")
         
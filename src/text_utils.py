@@ -0,0 +1,48 @@
+"""
+Text utilities for splitting LLM output into speakable sentences.
+
+This module only depends on the standard library and is fully annotated,
+so it can be compiled with mypyc (``mypyc src/text_utils.py``) for a faster
+boundary loop. The pure-Python module is used when no build exists.
+"""
+import re
+
+# Sentence punctuation already followed by whitespace, i.e. a finished sentence
+_SENT_BOUNDARY = re.compile(r'[.!?](?=\s)')
+
+# Words whose trailing period does not end a sentence
+_ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc",
+    "e.g", "i.e", "a.m", "p.m",
+})
+
+def _ends_with_abbreviation(text: str) -> bool:
+    """Check whether the word before a trailing period is a known abbreviation."""
+    words = text.split()
+    if not words:
+        return False
+    return words[-1].lstrip("(\"'").lower() in _ABBREVIATIONS
+
+def pop_speakable_sentences(buffer: str, min_length: int = 10) -> tuple[list[str], str]:
+    """Split finished sentences off a streaming buffer for speech synthesis.
+    
+    Sentences end at ".", "!" or "?" followed by whitespace. Periods after
+    abbreviations such as "Dr." do not end a sentence, and sentences shorter
+    than min_length characters are joined with the next one so every
+    synthesis request is worth sending.
+    Decimals never split since their period is not followed by whitespace.
+    
+    Returns the sentences to speak and the unfinished remainder.
+    """
+    sentences: list[str] = []
+    start: int = 0
+    for match in _SENT_BOUNDARY.finditer(buffer):
+        end: int = match.end()
+        if buffer[end - 1] == "." and _ends_with_abbreviation(buffer[start:end - 1]):
+            continue
+        sentence = buffer[start:end].strip()
+        if len(sentence) < min_length:
+            continue
+        sentences.append(sentence)
+        start = end
+    return sentences, buffer[start:]
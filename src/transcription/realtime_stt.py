@@ -1,9 +1,11 @@
 """
 Real-time speech-to-text implementation using RealtimeSTT.
 """
-import yaml
 import logging
+import queue
+import threading
 from RealtimeSTT import AudioToTextRecorder
+from ..config_utils import load_yaml
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +14,7 @@ class RealtimeTranscriber:
         """Initialize the transcriber."""
         # Load audio configuration
         try:
-            with open(config_path, "r") as f:
-                self.config = yaml.safe_load(f)
+            self.config = load_yaml(config_path)
         except Exception as e:
             logger.warning(f"Could not load audio config: {e}. Using defaults.")
             self.config = {
@@ -30,6 +31,11 @@ class RealtimeTranscriber:
             device=self.config["microphone"]["device_id"],
             sample_rate=self.config["microphone"]["sample_rate"]
         )
+        
+        # Process transcripts on a worker thread so the recorder can keep listening
+        self._queue: queue.Queue = queue.Queue(maxsize=8)
+        self._worker = threading.Thread(target=self._process_queue, name="transcript-worker", daemon=True)
+        self._worker.start()
         logger.info("Transcriber initialized. Wait until it says 'speak now'")
 
     def process_text(self, text: str) -> None:
@@ -41,11 +47,29 @@ class RealtimeTranscriber:
         """
         logger.info(f"Transcribed: {text}")
 
+    def _enqueue_text(self, text: str) -> None:
+        """Hand a transcript to the worker thread, dropping it if the worker is backed up."""
+        try:
+            self._queue.put_nowait(text)
+        except queue.Full:
+            logger.warning(f"Transcript queue is full, dropping: {text}")
+
+    def _process_queue(self) -> None:
+        """Worker loop that passes queued transcripts to process_text."""
+        while True:
+            text = self._queue.get()
+            try:
+                self.process_text(text)
+            except Exception as e:
+                logger.error(f"Error processing transcript: {e}")
+            finally:
+                self._queue.task_done()
+
     def start(self) -> None:
         """Start the transcription process."""
         try:
             while True:
-                self.recorder.text(self.process_text)
+                self.recorder.text(self._enqueue_text)
         except KeyboardInterrupt:
             logger.info("\nStopping transcription...")
             logger.info("Thank you for using TalkToLLM!")
@@ -0,0 +1,116 @@
+"""
+On-disk LRU cache for synthesized audio.
+"""
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "~/.cache/talktollm/tts"
+
+
+class DiskAudioCache:
+    """Content-addressed audio files, trimmed least recently used first."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_mb: float = 100, suffix: str = ".bin"):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): Directory the audio files are stored in
+            max_mb (float): Size limit in megabytes, 0 disables the cache
+            suffix (str): File extension for the stored audio
+        """
+        self._dir = Path(cache_dir).expanduser()
+        self._max_bytes = int(max_mb * 1024 * 1024)
+        self._suffix = suffix
+        self._lock = threading.Lock()
+        self._size = 0
+
+        if self._max_bytes <= 0:
+            return
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            self._size = sum(
+                e.stat().st_size for e in os.scandir(self._dir)
+                if e.is_file() and e.name.endswith(self._suffix)
+            )
+        except Exception as e:
+            logger.warning(f"Disabling audio disk cache: {str(e)}")
+            self._max_bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{key}{self._suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached audio for a key, or None on a miss."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Error reading cached audio: {str(e)}")
+            return None
+        # Mark as recently used; atime alone is unreliable on noatime mounts
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Store audio for a key, replacing the file atomically."""
+        if not self.enabled or not audio:
+            return
+        path = self._path(key)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+        except Exception as e:
+            logger.warning(f"Error writing cached audio: {str(e)}")
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            try:
+                old_size = path.stat().st_size
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Error writing cached audio: {str(e)}")
+            # Don't leave partial files behind, e.g. when the disk is full
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._size += len(audio) - old_size
+            if self._size > self._max_bytes:
+                self._trim()
+
+    def _trim(self) -> None:
+        """Delete the least recently used files until the cache fits its limit."""
+        try:
+            entries = [e for e in os.scandir(self._dir) if e.is_file() and e.name.endswith(self._suffix)]
+            entries.sort(key=lambda e: e.stat().st_atime)
+            self._size = sum(e.stat().st_size for e in entries)
+            for entry in entries:
+                if self._size <= self._max_bytes:
+                    break
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+                self._size -= size
+        except Exception as e:
+            logger.warning(f"Error trimming audio disk cache: {str(e)}")
@@ -2,14 +2,23 @@
 Base class for TTS implementations.
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+import hashlib
+import threading
 import yaml
 import logging
 from ..audio import AudioPlayer
+from ..config_utils import load_yaml
+from ._disk_cache import DEFAULT_CACHE_DIR, DiskAudioCache
 
 logger = logging.getLogger(__name__)
 
 class BaseTTS(ABC):
+    AUDIO_CACHE_SIZE = 128  # Maximum number of synthesized utterances kept in memory
+    AUDIO_CACHE_SUFFIX = ".bin"  # File extension for audio cached on disk
+    
     def __init__(self, config_path: str = "config/tts_config.yaml", device_name: str = None):
         """
         Initialize the TTS system.
@@ -18,7 +27,14 @@ class BaseTTS(ABC):
             config_path (str): Path to the configuration file
             device_name (str): Name of the audio device to use
         """
+        self._audio_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._audio_cache_lock = threading.Lock()
         self.config = self._load_config(config_path)
+        self._disk_cache = DiskAudioCache(
+            self.config.get("cache_dir", DEFAULT_CACHE_DIR),
+            self.config.get("max_cache_mb", 100),
+            self.AUDIO_CACHE_SUFFIX,
+        )
         self.audio_player = AudioPlayer(device_name)
         
         # Initialize settings
@@ -32,9 +48,10 @@ class BaseTTS(ABC):
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from YAML file."""
+        if not config_path:
+            return {}
         try:
-            with open(config_path, "r") as f:
-                return yaml.safe_load(f) or {}
+            return load_yaml(config_path)
         except FileNotFoundError:
             logger.info(f"Config file {config_path} not found. Using system defaults.")
             return {}
@@ -42,6 +59,38 @@ class BaseTTS(ABC):
             logger.warning(f"Error parsing config file: {e}. Using system defaults.")
             return {}
 
+    @staticmethod
+    def _cache_key(*parts: Any) -> str:
+        """Build an audio cache key from everything that affects synthesis."""
+        return hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+
+    def _get_cached_audio(self, key: str) -> Optional[bytes]:
+        """Return cached audio for a key, marking it as recently used."""
+        with self._audio_cache_lock:
+            audio = self._audio_cache.get(key)
+            if audio is not None:
+                self._audio_cache.move_to_end(key)
+                return audio
+        
+        # Fall back to audio cached on disk by an earlier run
+        audio = self._disk_cache.get(key)
+        if audio is not None:
+            self._remember_audio(key, audio)
+        return audio
+
+    def _cache_audio(self, key: str, audio: bytes) -> None:
+        """Store synthesized audio, evicting the least recently used entries."""
+        self._remember_audio(key, audio)
+        self._disk_cache.put(key, audio)
+
+    def _remember_audio(self, key: str, audio: bytes) -> None:
+        """Store audio in the in-memory cache only."""
+        with self._audio_cache_lock:
+            self._audio_cache[key] = audio
+            self._audio_cache.move_to_end(key)
+            while len(self._audio_cache) > self.AUDIO_CACHE_SIZE:
+                self._audio_cache.popitem(last=False)
+
     @abstractmethod
     def speak(self, text: str) -> None:
         """
@@ -52,6 +101,49 @@ class BaseTTS(ABC):
         """
         pass
 
+    @abstractmethod
+    def synthesize(self, text: str) -> bytes:
+        """
+        Convert text to encoded audio without playing it.
+        Safe to call from worker threads.
+        
+        Args:
+            text (str): The text to convert to speech
+            
+        Returns:
+            bytes: The encoded audio
+        """
+        pass
+
+    def synthesize_many(self, texts: List[str], max_workers: int = 4) -> List[bytes]:
+        """
+        Synthesize several texts concurrently.
+        
+        Args:
+            texts (List[str]): The texts to convert to speech
+            max_workers (int): Maximum number of concurrent synthesis requests
+            
+        Returns:
+            List[bytes]: The encoded audio for each text, in input order
+        """
+        if len(texts) <= 1:
+            return [self.synthesize(text) for text in texts]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(texts))) as pool:
+            return list(pool.map(self.synthesize, texts))
+
+    def play(self, audio_data: bytes) -> None:
+        """
+        Play audio returned by synthesize().
+        
+        Args:
+            audio_data (bytes): The encoded audio to play
+        """
+        self.audio_player.play_with_temp_file(audio_data)
+
+    def interrupt(self) -> None:
+        """Stop speaking immediately, e.g. when the user starts talking."""
+        self.audio_player.interrupt()
+
     @abstractmethod
     def save_to_file(self, text: str, output_path: str) -> None:
         """
@@ -2,6 +2,7 @@
 Coqui TTS implementation using Docker container.
 """
 import logging
+import orjson
 import requests
 import tempfile
 import os
@@ -11,22 +12,32 @@ from .base_tts import BaseTTS
 
 logger = logging.getLogger(__name__)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 class CoquiTTS(BaseTTS):
     """TTS implementation using Coqui TTS Docker container."""
+    AUDIO_CACHE_SUFFIX = ".wav"
     
     def __init__(self, config_path: str = None, device_name: str = None):
         """Initialize the Coqui TTS engine."""
         super().__init__(config_path, device_name)
-        self._config = self._load_config(config_path) if config_path else {}
         self._api_url = "http://localhost:5002"
-        self._language = self._config.get('language', 'en')
+        self._language = self.config.get('language', 'en')
+        self._speakers: Optional[List[str]] = None
+        
+        # Reuse pooled keep-alive connections to the TTS server
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self._session.mount("http://", adapter)
         
         # Verify connection to TTS server
         try:
-            response = requests.get(f"{self._api_url}/health")
+            response = self._session.get(f"{self._api_url}/health")
             response.raise_for_status()
-            server_info = response.json()
-            logger.info(f"Successfully connected to Coqui TTS server using model: {server_info['model']}")
+            server_info = orjson.loads(response.content)
+            # Part of the audio cache key, so switching server models doesn't replay old audio
+            self._model = server_info['model']
+            logger.info(f"Successfully connected to Coqui TTS server using model: {self._model}")
         except requests.exceptions.RequestException as e:
             raise Exception(
                 "Could not connect to Coqui TTS server. Please ensure:\n"
@@ -35,6 +46,24 @@ class CoquiTTS(BaseTTS):
                 "3. The service is accessible at http://localhost:5002"
             ) from e
 
+    def _audio_key(self, text: str) -> str:
+        """Cache key for text spoken by the current server model and settings."""
+        return self._cache_key(self._model, self._language, self._current_voice, text)
+
+    def _post_tts(self, text: str, stream: bool = False) -> requests.Response:
+        """Send a synthesis request to the TTS server."""
+        return self._session.post(
+            f"{self._api_url}/api/tts",
+            data=orjson.dumps({
+                "text": text,
+                "speaker_id": None,  # Use default speaker
+                "language_id": self._language,
+                "stream": stream  # Streaming models start sending audio before synthesis ends
+            }),
+            headers=_JSON_HEADERS,
+            stream=stream
+        )
+
     def speak(self, text: str) -> None:
         """Convert text to speech and play it."""
         if not text.strip():
@@ -42,22 +71,25 @@ class CoquiTTS(BaseTTS):
             return
 
         try:
-            # Request speech synthesis
-            response = requests.post(
-                f"{self._api_url}/api/tts",
-                json={
-                    "text": text,
-                    "speaker_id": None,  # Use default speaker
-                    "language_id": self._language
-                }
-            )
-            response.raise_for_status()
-            
-            # Get audio data
-            audio_data = response.content
-            
-            # Play the audio
-            self.audio_player.play_with_temp_file(audio_data)
+            key = self._audio_key(text)
+            audio_data = self._get_cached_audio(key)
+            if audio_data is not None:
+                self.audio_player.play_with_temp_file(audio_data)
+            else:
+                # Request speech synthesis and play it while it downloads
+                with self._post_tts(text, stream=True) as response:
+                    response.raise_for_status()
+                    
+                    received = bytearray()
+                    def chunks():
+                        for chunk in response.iter_content(chunk_size=4096):
+                            received.extend(chunk)
+                            yield chunk
+                    
+                    completed = self.audio_player.play_stream(chunks())
+                # An interrupted download is only part of the utterance, never cache it
+                if completed:
+                    self._cache_audio(key, bytes(received))
             logger.info("Speech completed successfully")
             
         except requests.exceptions.RequestException as e:
@@ -67,21 +99,26 @@ class CoquiTTS(BaseTTS):
             logger.error(f"Error during speech playback: {e}")
             raise
 
+    def synthesize(self, text: str) -> bytes:
+        """Convert text to WAV audio without playing it."""
+        key = self._audio_key(text)
+        audio_data = self._get_cached_audio(key)
+        if audio_data is None:
+            response = self._post_tts(text)
+            response.raise_for_status()
+            audio_data = response.content
+            self._cache_audio(key, audio_data)
+        return audio_data
+
     def save_to_file(self, text: str, output_path: str) -> None:
         """Convert text to speech and save it to a file."""
         try:
-            response = requests.post(
-                f"{self._api_url}/api/tts",
-                json={
-                    "text": text,
-                    "speaker_id": None,
-                    "language_id": self._language
-                }
-            )
-            response.raise_for_status()
-            
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            # Stream the body straight to disk instead of holding it in memory
+            with self._post_tts(text, stream=True) as response:
+                response.raise_for_status()
+                with open(output_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
             logger.info(f"Audio saved to {output_path}")
             
         except Exception as e:
@@ -94,13 +131,17 @@ class CoquiTTS(BaseTTS):
 
     def list_voices(self) -> List[str]:
         """List available voices."""
+        # The server's speakers are fixed for its loaded model, so ask only once
+        if self._speakers is not None:
+            return list(self._speakers)
         try:
-            response = requests.get(f"{self._api_url}/api/speakers")
+            response = self._session.get(f"{self._api_url}/api/speakers")
             response.raise_for_status()
-            speakers = response.json()
+            speakers = orjson.loads(response.content)
             if not speakers:
-                return ["default"]  # Tacotron2-DDC doesn't have multiple voices
-            return speakers
+                speakers = ["default"]  # Tacotron2-DDC doesn't have multiple voices
+            self._speakers = speakers
+            return list(speakers)
         except requests.exceptions.RequestException:
             logger.warning("Could not get speakers list from server, returning default")
             return ["default"]
@@ -112,4 +153,12 @@ class CoquiTTS(BaseTTS):
         so this method is implemented to satisfy the abstract base class
         contract but doesn't actually change the voice.
         """
-        logger.info(f"Voice selection not supported by Tacotron2-DDC model. Ignoring voice: {voice}") 
\ No newline at end of file
+        logger.info(f"Voice selection not supported by Tacotron2-DDC model. Ignoring voice: {voice}") 
+
+    def __del__(self):
+        """Cleanup when the object is destroyed."""
+        try:
+            if hasattr(self, '_session'):
+                self._session.close()
+        except:
+            pass
\ No newline at end of file
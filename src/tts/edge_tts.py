@@ -3,12 +3,26 @@ Edge TTS implementation using Microsoft Edge's online TTS service.
 """
 import logging
 import asyncio
+import concurrent.futures
+import functools
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
 import edge_tts
-from typing import List
+import orjson
+from typing import Dict, List, Optional, Tuple
 from .base_tts import BaseTTS
+from ..audio import miniaudio
 
 logger = logging.getLogger(__name__)
 
+VOICE_CACHE_PATH = Path("~/.cache/talktollm/voices.json").expanduser()
+VOICE_CACHE_TTL = 7 * 24 * 60 * 60  # Refresh the cached voice list weekly
+
 class EdgeTTS(BaseTTS):
     # Some good voice options from Edge TTS:
     DEFAULT_VOICE = "en-US-JennyNeural"  # Clear female voice
@@ -23,61 +37,196 @@ class EdgeTTS(BaseTTS):
         "british_ryan": "en-GB-RyanNeural",  # British male voice
         "british_sonia": "en-GB-SoniaNeural",  # British female voice
     }
+    _VOICE_LIST = tuple(AVAILABLE_VOICES.keys())
+    _PREFERRED_VOICES = frozenset(AVAILABLE_VOICES.values())
+    AUDIO_CACHE_SUFFIX = ".mp3"
+    # Edge TTS delivers 24 kHz mono MP3, played as 16-bit PCM without resampling
+    SAMPLE_RATE = 24000
+    CHANNELS = 1
+    
+    # Voice indexes, filled in once the voice list has been fetched
+    _voices_by_shortname: Dict[str, dict] = {}
+    _english_voices: Tuple[str, ...] = ()
+    _preferred_english_voices: Tuple[str, ...] = ()
 
     def __init__(self, config_path: str = "config/tts_config.yaml", device_name: str = None):
         """Initialize Edge TTS."""
-        super().__init__(config_path, device_name)
-        
-        # Create event loop for async operations
+        # Run a persistent event loop in the background for async operations.
+        # Started first, since validating a voice may need to fetch the voice list.
         try:
             self._loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self._loop)
+            self._thread = threading.Thread(target=self._loop.run_forever, name="edge-tts-loop", daemon=True)
+            self._thread.start()
         except Exception as e:
             logger.error(f"Error setting up event loop: {str(e)}")
             raise
         
-        # Get available voices
+        super().__init__(config_path, device_name)
+        
+        # Without miniaudio, stream playback through mpv when it is installed
+        self._mpv_path = shutil.which("mpv")
+
+    @functools.cached_property
+    def voices(self) -> List[dict]:
+        """All Edge voices, fetched on first use since the curated voices need no validation."""
         try:
-            self._voices = self._loop.run_until_complete(edge_tts.list_voices())
-            logger.info(f"Found {len(self._voices)} voices")
-            
-            # Log available voices for debugging
-            logger.debug("Available voices:")
-            for v in self._voices:
-                if v["Locale"].startswith("en-"):
-                    logger.debug(f"- {v['ShortName']} ({v['Locale']})")
-            
+            voices = self._load_voice_cache()
+            logger.info(f"Found {len(voices)} voices")
         except Exception as e:
             logger.error(f"Error getting voices: {str(e)}")
-            self._voices = []
+            voices = []
+        
+        # Index the voices once so set_voice is a dict lookup
+        self._voices_by_shortname = {v["ShortName"]: v for v in voices}
+        self._english_voices = tuple(v["ShortName"] for v in voices if v["Locale"].startswith("en-"))
+        self._preferred_english_voices = tuple(v for v in self._english_voices if v in self._PREFERRED_VOICES)
+        
+        # Log available voices for debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Available voices:")
+            for short_name in self._english_voices:
+                logger.debug(f"- {short_name} ({self._voices_by_shortname[short_name]['Locale']})")
+        return voices
+
+    def _load_voice_cache(self) -> List[dict]:
+        """Return the voice list from disk if fresh, otherwise fetch it and cache it."""
+        try:
+            if time.time() - VOICE_CACHE_PATH.stat().st_mtime < VOICE_CACHE_TTL:
+                voices = orjson.loads(VOICE_CACHE_PATH.read_bytes())
+                if voices:
+                    return voices
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable voice cache: {str(e)}")
+        
+        voices = self._run(edge_tts.list_voices())
+        try:
+            VOICE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=VOICE_CACHE_PATH.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(voices))
+            os.replace(tmp_path, VOICE_CACHE_PATH)
+        except Exception as e:
+            logger.warning(f"Error writing voice cache: {str(e)}")
+        return voices
+
+    def _run(self, coro):
+        """Run a coroutine on the background event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _synthesize_async(self, text: str) -> bytes:
+        """Internal async method to synthesize text into MP3 audio."""
+        if not self._current_voice:
+            raise Exception("No voice selected")
+            
+        key = self._audio_key(text)
+        audio_data = self._get_cached_audio(key)
+        if audio_data is None:
+            # Collect the audio stream
+            buf = bytearray()
+            async for chunk in self._communicate(text).stream():
+                if chunk["type"] == "audio":
+                    buf.extend(chunk["data"])
+            audio_data = bytes(buf)
+            self._cache_audio(key, audio_data)
+        return audio_data
+
+    def _audio_key(self, text: str) -> str:
+        """Cache key for text spoken with the current voice settings."""
+        return self._cache_key(self._current_voice, self._current_speed, self._current_volume, text)
+
+    def _communicate(self, text: str) -> edge_tts.Communicate:
+        """Create a communicator for the current voice settings."""
+        return edge_tts.Communicate(
+            text,
+            self._current_voice,
+            rate=f"{int((self._current_speed - 1.0) * 100):+d}%",
+            volume=f"{int(self._current_volume * 100) - 100:+d}%"
+        )
+
+    async def _stream_to_mpv(self, text: str) -> None:
+        """Pipe MP3 chunks into mpv as they arrive so playback starts on the first chunk."""
+        player = await asyncio.create_subprocess_exec(
+            self._mpv_path, "--no-cache", "--no-terminal", "--", "fd://0",
+            stdin=asyncio.subprocess.PIPE,
+        )
+        key = self._audio_key(text)
+        buf = bytearray()
+        try:
+            async for chunk in self._communicate(text).stream():
+                if chunk["type"] == "audio":
+                    buf.extend(chunk["data"])
+                    player.stdin.write(chunk["data"])
+                    await player.stdin.drain()
+        finally:
+            player.stdin.close()
+            await player.wait()
+        self._cache_audio(key, bytes(buf))
+
+    async def _stream_decoded(self, text: str) -> None:
+        """Decode MP3 chunks as they arrive and play them on the audio device."""
+        chunks: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        playback = asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(
+                self.audio_player.play_mp3_stream, iter(chunks.get, None),
+                sample_rate=self.SAMPLE_RATE, channels=self.CHANNELS,
+                preroll_ms=self.config.get("preroll_ms", 500),
+            )
+        )
+        key = self._audio_key(text)
+        buf = bytearray()
+        try:
+            async for chunk in self._communicate(text).stream():
+                if chunk["type"] == "audio":
+                    buf.extend(chunk["data"])
+                    chunks.put(chunk["data"])
+        finally:
+            chunks.put(None)
+            await playback
+        self._cache_audio(key, bytes(buf))
 
     async def _speak_async(self, text: str) -> None:
         """Internal async method to handle TTS."""
         try:
             if not self._current_voice:
                 raise Exception("No voice selected")
-                
-            # Create communicator with voice
-            communicate = edge_tts.Communicate(
-                text,
-                self._current_voice,
-                rate=f"{int((self._current_speed - 1.0) * 100):+d}%",
-                volume=f"{int(self._current_volume * 100) - 100:+d}%"
-            )
             
-            # Get audio stream
-            audio_stream = await communicate.stream()
-            audio_data = b""
-            async for chunk in audio_stream:
-                if chunk["type"] == "audio":
-                    audio_data += chunk["data"]
+            audio_data = self._get_cached_audio(self._audio_key(text))
+            if audio_data is None and miniaudio is not None:
+                await self._stream_decoded(text)
+                return
+            if audio_data is None and self._mpv_path:
+                await self._stream_to_mpv(text)
+                return
+            if audio_data is None:
+                audio_data = await self._synthesize_async(text)
             
-            # Play the audio
-            self.audio_player.play_with_temp_file(audio_data)
+            # Play the audio without blocking the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.audio_player.play_with_temp_file, audio_data
+            )
                     
         except Exception as e:
             raise Exception(f"TTS error: {str(e)}")
 
+    def speak_async(self, text: str) -> concurrent.futures.Future:
+        """
+        Start speaking text on the background event loop without waiting for it.
+        
+        Args:
+            text (str): The text to convert to speech
+            
+        Returns:
+            concurrent.futures.Future: Resolves once playback has finished
+        """
+        if not text.strip():
+            logger.warning("Empty text provided, skipping TTS")
+            future = concurrent.futures.Future()
+            future.set_result(None)
+            return future
+        return asyncio.run_coroutine_threadsafe(self._speak_async(text), self._loop)
+
     def speak(self, text: str) -> None:
         """Convert text to speech and play it."""
         if not text.strip():
@@ -85,27 +234,32 @@ class EdgeTTS(BaseTTS):
             return
             
         try:
-            self._loop.run_until_complete(self._speak_async(text))
+            self.speak_async(text).result()
             logger.info("Speech completed successfully")
         except Exception as e:
             logger.error(f"Error during text-to-speech: {str(e)}")
             raise
 
+    def synthesize(self, text: str) -> bytes:
+        """Convert text to MP3 audio without playing it."""
+        try:
+            return self._run(self._synthesize_async(text))
+        except Exception as e:
+            raise Exception(f"TTS error: {str(e)}")
+
     async def _save_async(self, text: str, output_path: str) -> None:
         """Internal async method to handle saving TTS to file."""
         try:
-            if not self._current_voice:
-                raise Exception("No voice selected")
-                
-            communicate = edge_tts.Communicate(text, self._current_voice)
-            await communicate.save(output_path)
+            audio_data = await self._synthesize_async(text)
+            with open(output_path, "wb") as f:
+                f.write(audio_data)
         except Exception as e:
             raise Exception(f"TTS save error: {str(e)}")
 
     def save_to_file(self, text: str, output_path: str) -> None:
         """Convert text to speech and save it to a file."""
         try:
-            self._loop.run_until_complete(self._save_async(text, output_path))
+            self._run(self._save_async(text, output_path))
             logger.info(f"Audio saved to {output_path}")
         except Exception as e:
             logger.error(f"Error saving text-to-speech to file: {str(e)}")
@@ -116,33 +270,37 @@ class EdgeTTS(BaseTTS):
             # Convert friendly name to full voice name if needed
             voice_id = self.AVAILABLE_VOICES.get(voice.lower(), voice)
             
+            # The curated voices are known to exist, skip fetching the full list
+            if voice_id in self._PREFERRED_VOICES:
+                self._current_voice = voice_id
+                logger.info(f"Voice set to {voice_id}")
+                return
+            
+            # Without a voice list there is nothing to validate against
+            voices = self.voices
+            if not voices:
+                self._current_voice = voice_id
+                return
+            
             # Find the voice in available voices
-            matching_voices = [v for v in self._voices if v["ShortName"] == voice_id]
-            if matching_voices:
+            if voice_id in self._voices_by_shortname:
                 self._current_voice = voice_id
                 logger.info(f"Voice set to {voice_id}")
+            elif self._preferred_english_voices:
+                # Try to find a voice that matches our preferred voices first
+                self._current_voice = self._preferred_english_voices[0]
+                logger.info(f"Using preferred voice: {self._current_voice}")
+            elif self._english_voices:
+                self._current_voice = self._english_voices[0]
+                logger.info(f"Using English voice: {self._current_voice}")
             else:
-                # If voice not found, try to find it in the list of voices
-                english_voices = [v for v in self._voices if v["Locale"].startswith("en-")]
-                if english_voices:
-                    # Try to find a voice that matches our preferred voices first
-                    preferred_voices = set(self.AVAILABLE_VOICES.values())
-                    preferred_matches = [v for v in english_voices if v["ShortName"] in preferred_voices]
-                    
-                    if preferred_matches:
-                        self._current_voice = preferred_matches[0]["ShortName"]
-                        logger.info(f"Using preferred voice: {self._current_voice}")
-                    else:
-                        self._current_voice = english_voices[0]["ShortName"]
-                        logger.info(f"Using English voice: {self._current_voice}")
-                else:
-                    # Last resort: use the first available voice
-                    self._current_voice = self._voices[0]["ShortName"]
-                    logger.warning(f"No English voices found, using fallback voice: {self._current_voice}")
+                # Last resort: use the first available voice
+                self._current_voice = voices[0]["ShortName"]
+                logger.warning(f"No English voices found, using fallback voice: {self._current_voice}")
         except Exception as e:
             logger.error(f"Error setting voice: {str(e)}")
-            if not self._current_voice and self._voices:
-                self._current_voice = self._voices[0]["ShortName"]
+            if not self._current_voice and self.voices:
+                self._current_voice = self.voices[0]["ShortName"]
                 logger.warning(f"Using fallback voice: {self._current_voice}")
 
     def get_default_voice(self) -> str:
@@ -151,12 +309,14 @@ class EdgeTTS(BaseTTS):
 
     def list_voices(self) -> List[str]:
         """Get a list of available friendly voice names."""
-        return list(self.AVAILABLE_VOICES.keys())
+        return list(self._VOICE_LIST)
 
     def __del__(self):
         """Cleanup when the object is destroyed."""
         try:
             if hasattr(self, '_loop') and self._loop and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=1.0)
                 self._loop.close()
         except:
             pass 
\ No newline at end of file
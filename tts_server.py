@@ -2,12 +2,19 @@
 FastAPI server for Coqui TTS.
 """
 import os
-import io
+import asyncio
+import hashlib
 import logging
-from typing import Optional
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterator, Optional
+import numpy as np
+import torch
 from pydantic import BaseModel
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from TTS.utils.manage import ModelManager
 from TTS.utils.synthesizer import Synthesizer
 
@@ -26,11 +33,34 @@ class TTSRequest(BaseModel):
     text: str
     speaker_id: Optional[str] = None
     language_id: Optional[str] = None
+    stream: bool = False  # Send audio while it is generated, if the model supports it
 
 # Get model info from environment
 MODEL_NAME = os.getenv("MODEL_NAME", "tts_models/en/ljspeech/tacotron2-DDC")
 VOCODER_NAME = os.getenv("VOCODER_NAME", "vocoder_models/en/ljspeech/hifigan_v2")
 USE_CPU = os.getenv("USE_CPU", "true").lower() == "true"
+# Number of synthesizers loaded, i.e. how many requests are synthesized in parallel
+N_WORKERS = max(1, int(os.getenv("TTS_WORKERS", "1")))
+# Synthesize a short phrase on every worker at startup, so the first request doesn't pay for warmup
+WARMUP = os.getenv("TTS_WARMUP", "true").lower() == "true"
+WARMUP_TEXT = "Hello."
+
+# Synthesized audio cache: recent entries in memory, the rest on disk
+CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.expanduser("~/.local/share/tts/audio_cache"))
+CACHE_MB = float(os.getenv("TTS_CACHE_MB", "512"))
+MEMORY_CACHE_SIZE = 64
+
+# Size of the PCM pieces sent to the client
+STREAM_CHUNK_BYTES = 4096
+WAV_HEADER_SIZE = 44
+# Data size used in the header of a WAV stream of unknown length
+WAV_UNKNOWN_SIZE = 0xFFFFFFFF
+
+# Split the CPU cores between the workers, so parallel requests don't
+# oversubscribe the machine with one full-width thread pool each
+if USE_CPU:
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // N_WORKERS))
+    torch.set_num_interop_threads(1)
 
 # Initialize TTS
 try:
@@ -50,19 +80,156 @@ try:
     model_path, config_path, model_item = manager.download_model(MODEL_NAME)
     logger.info(f"TTS model downloaded successfully: {model_path}")
     
-    # Initialize synthesizer
-    logger.info("Initializing synthesizer...")
-    synthesizer = Synthesizer(
-        model_path,
-        config_path,
-        use_cuda=not USE_CPU
-    )
-    logger.info("TTS initialized successfully")
+    # Initialize synthesizers
+    logger.info(f"Initializing {N_WORKERS} synthesizer(s)...")
+    workers = [
+        Synthesizer(
+            model_path,
+            config_path,
+            use_cuda=not USE_CPU
+        )
+        for _ in range(N_WORKERS)
+    ]
+    synthesizer = workers[0]
+    # XTTS models can generate audio incrementally. The TTS==0.8.0 pinned in Dockerfile.tts
+    # has no XTTS, so streaming only applies to images built on a newer Coqui release.
+    SUPPORTS_STREAMING = hasattr(synthesizer.tts_model, "inference_stream")
+    logger.info(f"TTS initialized successfully (streaming {'supported' if SUPPORTS_STREAMING else 'not supported'})")
 except Exception as e:
     logger.error(f"Failed to initialize TTS: {str(e)}")
     logger.error("Full error details:", exc_info=True)
     raise
 
+class AudioCache:
+    """Two-tier LRU cache of WAV files keyed on everything that affects synthesis."""
+    
+    def __init__(self, cache_dir: str, max_mb: float, memory_size: int):
+        self._dir = cache_dir
+        self._max_bytes = int(max_mb * 1024 * 1024)
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = memory_size
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        if self._max_bytes > 0:
+            try:
+                os.makedirs(self._dir, exist_ok=True)
+                self._disk_bytes = sum(e.stat().st_size for e in os.scandir(self._dir) if e.name.endswith(".wav"))
+            except Exception as e:
+                logger.warning(f"Disabling audio disk cache: {str(e)}")
+                self._max_bytes = 0
+    
+    @staticmethod
+    def key(request: "TTSRequest") -> str:
+        return hashlib.blake2b(
+            f"{MODEL_NAME}|{VOCODER_NAME}|{request.text}|{request.speaker_id}|{request.language_id}".encode(),
+            digest_size=16,
+        ).hexdigest()
+    
+    def path(self, key: str) -> str:
+        return os.path.join(self._dir, f"{key}.wav")
+    
+    def _remember(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_size:
+                self._memory.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Return WAV data cached in memory, or None."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+            return data
+    
+    def file(self, key: str) -> Optional[str]:
+        """Return the path of WAV data cached on disk, or None."""
+        if self._max_bytes <= 0:
+            return None
+        path = self.path(key)
+        try:
+            os.utime(path)  # Mark as recently used for trimming
+        except FileNotFoundError:
+            return None
+        return path
+    
+    def put(self, key: str, data: bytes) -> Optional[str]:
+        """
+        Store WAV data in memory and atomically on disk, trimming the disk cache if needed.
+        Returns the path of the cached file, or None if it was not written.
+        """
+        self._remember(key, data)
+        if self._max_bytes <= 0:
+            return None
+        path = self.path(key)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+        except Exception as e:
+            logger.warning(f"Failed to cache audio: {str(e)}")
+            return None
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # An overwritten file is already counted in the disk total
+            try:
+                old_size = os.path.getsize(path)
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to cache audio: {str(e)}")
+            # Don't leave partial files behind, e.g. when the disk is full
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return None
+        with self._lock:
+            self._disk_bytes += len(data) - old_size
+            if self._disk_bytes > self._max_bytes:
+                self._trim(keep=path)
+        return path
+    
+    def _trim(self, keep: str) -> None:
+        """Delete the least recently used files, except keep, until the disk cache fits its limit."""
+        try:
+            entries = sorted(
+                (e for e in os.scandir(self._dir) if e.name.endswith(".wav") and e.path != keep),
+                key=lambda e: e.stat().st_atime,
+            )
+            self._disk_bytes = os.path.getsize(keep) + sum(e.stat().st_size for e in entries)
+            for entry in entries:
+                if self._disk_bytes <= self._max_bytes:
+                    break
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+                self._disk_bytes -= size
+        except Exception as e:
+            logger.warning(f"Failed to trim audio cache: {str(e)}")
+
+audio_cache = AudioCache(CACHE_DIR, CACHE_MB, MEMORY_CACHE_SIZE)
+
+# Synthesizers not currently in use, created on the server's event loop
+idle_workers: Optional[asyncio.Queue] = None
+
+@app.on_event("startup")
+async def start_worker_pool():
+    """Make all synthesizers available to requests."""
+    global idle_workers
+    idle_workers = asyncio.Queue()
+    if WARMUP:
+        # Runs the models directly, since the audio cache would answer a warmup request
+        results = await asyncio.gather(
+            *(asyncio.to_thread(worker.tts, WARMUP_TEXT) for worker in workers), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"TTS warmup failed: {str(result)}")
+        logger.info(f"Warmed up {N_WORKERS} synthesizer(s)")
+    for worker in workers:
+        idle_workers.put_nowait(worker)
+
 @app.get("/health")
 def health_check():
     """Health check endpoint."""
@@ -72,19 +239,113 @@ def health_check():
         "use_cpu": USE_CPU
     }
 
+def wav_header(sample_rate: int, data_size: int = WAV_UNKNOWN_SIZE) -> bytes:
+    """Build the 44-byte header of a mono 16-bit PCM WAV file."""
+    riff_size = WAV_UNKNOWN_SIZE if data_size == WAV_UNKNOWN_SIZE else 36 + data_size
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+
+def encode_wav(wav, sample_rate: int) -> bytes:
+    """Encode a float waveform as a normalized mono 16-bit PCM WAV file."""
+    samples = np.asarray(wav, dtype=np.float32)
+    
+    # Header and samples share one buffer; the 44-byte header is 22 int16 slots
+    header_slots = WAV_HEADER_SIZE // 2
+    out = np.empty(header_slots + len(samples), dtype="<i2")
+    out[:header_slots] = np.frombuffer(wav_header(sample_rate, 2 * len(samples)), dtype="<i2")
+    # Peak-normalize the whole utterance, as Synthesizer.save_wav does
+    peak = float(np.max(np.abs(samples))) if len(samples) else 0.0
+    np.multiply(samples, 32767 / max(0.01, peak), out=out[header_slots:], casting="unsafe")
+    return out.tobytes()
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    """
+    Convert float samples to 16-bit PCM bytes at a fixed scale.
+    Streamed chunks are not normalized, so every chunk of an utterance keeps the same loudness.
+    """
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+def xtts_chunks(worker: Synthesizer, request: TTSRequest) -> Iterator[bytes]:
+    """Yield 16-bit PCM as an XTTS model generates it (needs a Coqui release with XTTS)."""
+    model = worker.tts_model
+    speakers = model.speaker_manager.speakers
+    speaker = speakers[request.speaker_id or next(iter(speakers))]
+    for chunk in model.inference_stream(
+        request.text,
+        request.language_id or "en",
+        speaker["gpt_cond_latent"],
+        speaker["speaker_embedding"],
+        stream_chunk_size=20,
+    ):
+        yield to_pcm16(chunk.cpu().numpy())
+
+def stream_wav(first: bytes, rest: Iterator[bytes], release: Callable[[], None]) -> Iterator[bytes]:
+    """Yield a WAV header of unknown length followed by the PCM chunks, then release the worker."""
+    try:
+        yield wav_header(synthesizer.output_sample_rate)
+        yield first
+        yield from rest
+    finally:
+        release()
+
+def iter_chunks(data: bytes) -> Iterator[bytes]:
+    """Yield data in pieces small enough to stream."""
+    for start in range(0, len(data), STREAM_CHUNK_BYTES):
+        yield data[start:start + STREAM_CHUNK_BYTES]
+
 @app.post("/api/tts")
-def text_to_speech(request: TTSRequest):
+async def text_to_speech(request: TTSRequest):
     """Convert text to speech."""
     try:
+        key = audio_cache.key(request)
+        data = audio_cache.get(key)
+        if data is not None:
+            logger.info(f"Serving cached speech for text: {request.text}")
+            return Response(data, media_type="audio/wav")
+        path = await asyncio.to_thread(audio_cache.file, key)
+        if path is not None:
+            # Sent straight from the file, without reading it into memory first
+            logger.info(f"Serving cached speech for text: {request.text}")
+            return FileResponse(path, media_type="audio/wav")
+        
+        if request.stream and SUPPORTS_STREAMING:
+            logger.info(f"Streaming speech for text: {request.text}")
+            worker = await idle_workers.get()
+            loop = asyncio.get_running_loop()
+            
+            def release() -> None:
+                # Called from Starlette's threadpool once the response has been sent
+                loop.call_soon_threadsafe(idle_workers.put_nowait, worker)
+            
+            try:
+                # Wait for the first chunk here so failures still become HTTP errors
+                chunks = xtts_chunks(worker, request)
+                first = await asyncio.to_thread(next, chunks, b"")
+            except Exception:
+                release()
+                raise
+            return StreamingResponse(stream_wav(first, chunks, release), media_type="audio/wav")
+        
         logger.info(f"Generating speech for text: {request.text}")
-        wav = synthesizer.tts(request.text, speaker_name=request.speaker_id, language_name=request.language_id)
+        # Synthesis blocks for seconds, keep it off the event loop
+        worker = await idle_workers.get()
+        try:
+            wav = await asyncio.to_thread(
+                worker.tts, request.text, speaker_name=request.speaker_id, language_name=request.language_id
+            )
+        finally:
+            idle_workers.put_nowait(worker)
         
-        # Convert to bytes
-        wav_bytes = io.BytesIO()
-        synthesizer.save_wav(wav, wav_bytes)
-        wav_bytes.seek(0)
+        data = encode_wav(wav, synthesizer.output_sample_rate)
+        path = await asyncio.to_thread(audio_cache.put, key, data)
+        if path is not None:
+            return FileResponse(path, media_type="audio/wav")
         
-        return StreamingResponse(wav_bytes, media_type="audio/wav")
+        return StreamingResponse(iter_chunks(data), media_type="audio/wav")
     except Exception as e:
         logger.error(f"TTS failed: {str(e)}")
         logger.error("Full error details:", exc_info=True)